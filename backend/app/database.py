@@ -5,7 +5,11 @@ from app.config import settings
 # Supabase URL might need adjustment using postgresql:// instead of postgres:// 
 DATABASE_URL = settings.DATABASE_URL.replace("postgres://", "postgresql://")
 
-engine = create_engine(DATABASE_URL, pool_pre_ping=True)
+# Bound how long an unreachable database can block a request. The statement timeout is set per
+# transaction (see fetch_historical_prices) because transaction poolers reject startup options.
+connect_args = {"connect_timeout": settings.DB_CONNECT_TIMEOUT_SECONDS}
+
+engine = create_engine(DATABASE_URL, pool_pre_ping=True, connect_args=connect_args)
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
 Base = declarative_base()
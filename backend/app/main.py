@@ -13,31 +13,64 @@ logger = logging.getLogger(__name__)
 # Global variables to hold models
 models = {}
 
+def load_models():
+    """
+    Loads every serving model into the shared `models` dict.
+    Used by the API lifespan and by offline tooling that needs the same artifacts.
+    """
+    logger.info(f"Loading Spoilage Model from {settings.SPOILAGE_MODEL_PATH}")
+    models['spoilage_model'] = joblib.load(settings.SPOILAGE_MODEL_PATH)
+    
+    logger.info(f"Loading Forecast Model from {settings.FORECAST_MODEL_PATH}")
+    models['forecast_model'] = joblib.load(settings.FORECAST_MODEL_PATH)
+    
+    logger.info(f"Loading Feature Columns from {settings.FEATURE_COLUMNS_PATH}")
+    models['feature_columns'] = joblib.load(settings.FEATURE_COLUMNS_PATH)
+    
+    logger.info(f"Loading Crop Recommendation Model from {settings.CROP_REC_MODEL_PATH}")
+    import pickle
+    with open(settings.CROP_REC_MODEL_PATH, 'rb') as f:
+        loaded_ml_model_data = pickle.load(f)
+        models['crop_rec_model'] = loaded_ml_model_data['model']
+        models['crop_rec_feature_columns'] = loaded_ml_model_data['feature_columns']
+
+def build_spoilage_surface():
+    """
+    Precomputes the spoilage response surface and keeps it only if its measured error is acceptable.
+    """
+    from app.services.spoilage_surface import SpoilageResponseSurface
+    surface = SpoilageResponseSurface.build(models['spoilage_model'], tolerance=settings.SPOILAGE_SURFACE_TOLERANCE)
+    report = surface.report
+    logger.info(f"Spoilage response surface: {report}")
+    if (
+        not report['coverage']
+        or report['max_probability_error'] > settings.SPOILAGE_SURFACE_MAX_ERROR
+        or report['class_agreement'] < settings.SPOILAGE_SURFACE_MIN_CLASS_AGREEMENT
+    ):
+        logger.warning(
+            f"Spoilage response surface outside bounds (max probability error {report['max_probability_error']}, "
+            f"class agreement {report['class_agreement']}); serving from the model instead."
+        )
+        return
+    models['spoilage_surface'] = surface
+
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     # Load Models on Startup
     try:
-        logger.info(f"Loading Spoilage Model from {settings.SPOILAGE_MODEL_PATH}")
-        models['spoilage_model'] = joblib.load(settings.SPOILAGE_MODEL_PATH)
-        
-        logger.info(f"Loading Forecast Model from {settings.FORECAST_MODEL_PATH}")
-        models['forecast_model'] = joblib.load(settings.FORECAST_MODEL_PATH)
-        
-        logger.info(f"Loading Feature Columns from {settings.FEATURE_COLUMNS_PATH}")
-        models['feature_columns'] = joblib.load(settings.FEATURE_COLUMNS_PATH)
-        
-        logger.info(f"Loading Crop Recommendation Model from {settings.CROP_REC_MODEL_PATH}")
-        import pickle
-        with open(settings.CROP_REC_MODEL_PATH, 'rb') as f:
-            loaded_ml_model_data = pickle.load(f)
-            models['crop_rec_model'] = loaded_ml_model_data['model']
-            models['crop_rec_feature_columns'] = loaded_ml_model_data['feature_columns']
-
+        load_models()
         logger.info("All models loaded successfully.")
     except Exception as e:
         logger.error(f"Error loading models: {e}")
         # Depending on requirements, we might want to raise here to prevent startup
         # But for development, letting it start with a broken model state might be okay temporarily.
+
+    # The surface is an optional accelerator: if it cannot be built, requests are served by the model
+    if settings.SPOILAGE_SURFACE_ENABLED and 'spoilage_model' in models:
+        try:
+            build_spoilage_surface()
+        except Exception as e:
+            logger.error(f"Error building spoilage response surface, serving from the model instead: {e}")
     
     yield
     
@@ -1,8 +1,11 @@
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, HTTPException, Request, Response
+from fastapi.concurrency import run_in_threadpool
 import logging
+from app.config import settings
 from app.schemas.requests import SpoilageRequest
-from app.schemas.responses import SpoilageResponse
+from app.schemas.responses import SpoilageResponse, SpoilageSurfaceResponse
 from app.services.spoilage_service import predict_spoilage
+from app.services.risk_map_service import RISK_MAP_MEDIA_TYPE, predict_spoilage_risk_map
 
 router = APIRouter()
 logger = logging.getLogger(__name__)
@@ -20,3 +23,44 @@ def get_spoilage_prediction(request: SpoilageRequest):
     except Exception as e:
         logger.error(f"Internal Error: {str(e)}")
         raise HTTPException(status_code=500, detail="Internal server error during prediction.")
+
+@router.get("/spoilage/surface", response_model=SpoilageSurfaceResponse)
+def get_spoilage_surface_report():
+    """
+    Reports whether the precomputed spoilage response surface is serving requests
+    and its measured error against the live model.
+    """
+    from app.main import models
+    surface = models.get('spoilage_surface')
+    if surface is None:
+        return SpoilageSurfaceResponse(enabled=False)
+    return SpoilageSurfaceResponse(enabled=True, **surface.report)
+
+@router.post("/spoilage/risk-map", response_class=Response)
+async def get_spoilage_risk_map(request: Request):
+    """
+    Scores spoilage risk for every weather cell x crop x storage day combination.
+    Request and response bodies are .npz archives (see predict_spoilage_risk_map).
+    """
+    max_bytes = settings.SPOILAGE_RISK_MAP_MAX_BODY_BYTES
+    too_large = HTTPException(status_code=413, detail=f"Request body exceeds {max_bytes} bytes.")
+    if int(request.headers.get("content-length") or 0) > max_bytes:
+        raise too_large
+    # Read incrementally so a missing or understated Content-Length cannot bypass the limit
+    chunks, received = [], 0
+    async for chunk in request.stream():
+        received += len(chunk)
+        if received > max_bytes:
+            raise too_large
+        chunks.append(chunk)
+    payload = b"".join(chunks)
+
+    try:
+        result = await run_in_threadpool(predict_spoilage_risk_map, payload)
+        return Response(content=result, media_type=RISK_MAP_MEDIA_TYPE)
+    except ValueError as e:
+        logger.error(f"Validation Error: {str(e)}")
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        logger.error(f"Internal Error: {str(e)}")
+        raise HTTPException(status_code=500, detail="Internal server error during risk map prediction.")
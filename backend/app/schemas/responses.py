@@ -1,5 +1,5 @@
 from pydantic import BaseModel
-from typing import List
+from typing import List, Optional
 
 class SpoilageResponse(BaseModel):
     class_label: str = BaseModel.model_fields.get("class", "class_label") # Workaround for reserved keyword 'class'
@@ -17,9 +17,28 @@ class SpoilageResponse(BaseModel):
             }
         }
 
+class SpoilageSurfaceResponse(BaseModel):
+    enabled: bool
+    grid_shape: List[int] = []
+    grid_points: int = 0
+    size_bytes: int = 0
+    tolerance: Optional[float] = None
+    trusted_cells: Optional[float] = None
+    validation_samples: int = 0
+    coverage: Optional[float] = None
+    max_risk_error: Optional[float] = None
+    p99_risk_error: Optional[float] = None
+    mean_risk_error: Optional[float] = None
+    max_probability_error: Optional[float] = None
+    class_agreement: Optional[float] = None
+    build_seconds: Optional[float] = None
+
 class ForecastResponse(BaseModel):
     forecast: List[float]
     trend_percent: float
+    # True when the price history did not come from a live database read
+    stale: bool = False
+    data_source: str = "database"  # database | cache | generated
 
 class DecisionResponse(BaseModel):
     decision: str
@@ -31,6 +50,8 @@ class DecisionResponse(BaseModel):
     spoilage_probability: float
     spoilage_class: str
     model_confidence: float
+    stale: bool = False
+    data_source: str = "database"
 
 class CropRecommendationResponse(BaseModel):
     recommended_crop: str
@@ -0,0 +1,73 @@
+import logging
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+class CircuitBreaker:
+    """
+    Fails fast after repeated errors from a dependency (e.g. PostgreSQL).
+
+    After `failure_threshold` consecutive failures (calls that raised, or succeeded but took
+    longer than `slow_call_seconds`) the circuit opens and callers are told to skip the
+    dependency. Once `probe_interval` seconds have passed the circuit goes half-open:
+    exactly one real call is let through as a trial while every other caller keeps skipping.
+    The circuit closes only if that trial succeeds within the latency budget, otherwise it
+    reopens for another interval. A trial that never reports back is replaced after one
+    more interval.
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, name: str, failure_threshold: int = 3, probe_interval: float = 30.0,
+                 slow_call_seconds: float = None):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.probe_interval = probe_interval
+        self.slow_call_seconds = slow_call_seconds
+        self.state = self.CLOSED
+        self._failures = 0
+        # When the circuit last opened, or when the current trial call was let through
+        self._since = 0.0
+        self._lock = threading.Lock()
+
+    def allow_request(self) -> bool:
+        if self.state == self.CLOSED:
+            return True
+        with self._lock:
+            if self.state == self.CLOSED:
+                return True
+            if time.monotonic() - self._since < self.probe_interval:
+                return False
+            self.state = self.HALF_OPEN
+            self._since = time.monotonic()
+        logger.info(f"Circuit '{self.name}' half-open, letting one trial call through.")
+        return True
+
+    def record_success(self, elapsed: float = None):
+        if self.slow_call_seconds is not None and elapsed is not None and elapsed > self.slow_call_seconds:
+            logger.warning(f"Circuit '{self.name}' call took {elapsed:.2f}s, counting it as a failure.")
+            self.record_failure()
+            return
+        with self._lock:
+            self._failures = 0
+            if self.state != self.HALF_OPEN:
+                return
+            self.state = self.CLOSED
+        logger.info(f"Circuit '{self.name}' closed, dependency recovered.")
+
+    def record_failure(self):
+        with self._lock:
+            self._failures += 1
+            if self.state == self.HALF_OPEN:
+                self.state = self.OPEN
+                self._since = time.monotonic()
+                logger.warning(f"Circuit '{self.name}' trial call failed, reopening.")
+                return
+            if self.state == self.OPEN or self._failures < self.failure_threshold:
+                return
+            self.state = self.OPEN
+            self._since = time.monotonic()
+        logger.warning(f"Circuit '{self.name}' opened after {self._failures} consecutive failures.")
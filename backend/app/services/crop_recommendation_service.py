@@ -6,6 +6,9 @@ from app.schemas.responses import CropRecommendationResponse
 
 logger = logging.getLogger(__name__)
 
+# Categorical inputs of the crop recommendation model, in one-hot encoding order
+CROP_REC_INPUT_COLUMNS = ['Soil_Type', 'Previous_Crop', 'State']
+
 # Dummy/Static dictionaries for crop details (you can expand this or load from CSV)
 water_requirement = {
     "Rice": "High", "Wheat": "Medium", "Cotton": "Medium", "Sugarcane": "Very High",
@@ -38,10 +41,10 @@ def recommend_crop_ml_from_loaded_model(request: CropRecommendationRequest) -> C
 
         # Create a DataFrame from the input arguments
         input_data = pd.DataFrame([[request.soil_type, request.previous_crop, request.state]],
-                                  columns=['Soil_Type', 'Previous_Crop', 'State'])
+                                  columns=CROP_REC_INPUT_COLUMNS)
 
         # Apply one-hot encoding to the input, ensuring columns match loaded_feature_columns
-        input_encoded = pd.get_dummies(input_data, columns=['Soil_Type', 'Previous_Crop', 'State'])
+        input_encoded = pd.get_dummies(input_data, columns=CROP_REC_INPUT_COLUMNS)
 
         # Reindex to match the training data's columns and fill missing with 0
         input_encoded = input_encoded.reindex(columns=loaded_feature_columns, fill_value=0)
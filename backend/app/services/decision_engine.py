@@ -94,7 +94,9 @@ def evaluate_decision(req: DecisionRequest, db: Session) -> DecisionResponse:
             trend_percent=round(forecast_resp.trend_percent, 2),
             spoilage_probability=round(Rs, 4),
             spoilage_class=spoilage_resp.class_label,
-            model_confidence=round(Cm, 4)
+            model_confidence=round(Cm, 4),
+            stale=forecast_resp.stale,
+            data_source=forecast_resp.data_source
         )
         
     except Exception as e:
@@ -2,6 +2,48 @@ import pandas as pd
 import numpy as np
 from app.schemas.requests import SpoilageRequest
 
+# Exact column order as specified by the model's actual signature
+SPOILAGE_FEATURE_COLUMNS = [
+    'Days_after_harvest', 'Temperature', 'Relative_Humidity', 'Price_drop_percent',
+    'Days_Temp', 'Days_Humidity', 'Temp_Humidity', 'Days_Squared',
+    'Crop_Potato', 'Crop_Rice', 'Crop_Tomato', 'Crop_Wheat'
+]
+
+def construct_spoilage_features_batch(crop, temperature, humidity, days_after_harvest, price_drop_percent) -> pd.DataFrame:
+    """
+    Vectorized version of construct_spoilage_features for many rows at once.
+    Every argument is an array-like of equal length (e.g. the columns of dataset/spoilage.csv).
+    Crops outside the one-hot columns (e.g. Onion, the dropped baseline) get all zeros.
+    """
+    days = np.asarray(days_after_harvest)
+    temp = np.asarray(temperature)
+    rh = np.asarray(humidity)
+
+    data = {
+        'Days_after_harvest': days,
+        'Temperature': temp,
+        'Relative_Humidity': rh,
+        'Price_drop_percent': np.asarray(price_drop_percent),
+        'Days_Temp': days * temp,
+        'Days_Humidity': days * rh,
+        'Temp_Humidity': temp * rh,
+        'Days_Squared': days ** 2,
+    }
+
+    # One-hot encode crops by comparing against the few distinct names only
+    crop_names, crop_codes = np.unique(np.asarray(crop, dtype=str), return_inverse=True)
+    crop_codes = crop_codes.reshape(-1)
+    for col in SPOILAGE_FEATURE_COLUMNS:
+        if col.startswith('Crop_'):
+            data[col] = np.zeros(len(crop_codes), dtype=np.int64)
+    for code, name in enumerate(crop_names):
+        crop_col = f"Crop_{name.capitalize()}"
+        if crop_col in data:
+            data[crop_col] = data[crop_col] | (crop_codes == code)
+
+    # Create DataFrame with exact column order as specified by the model's actual signature
+    return pd.DataFrame(data, columns=SPOILAGE_FEATURE_COLUMNS)
+
 def construct_spoilage_features(req: SpoilageRequest) -> pd.DataFrame:
     """
     Constructs the exact 12-feature array expected by the XGBoost Spoilage model.
@@ -10,37 +52,6 @@ def construct_spoilage_features(req: SpoilageRequest) -> pd.DataFrame:
      'Days_Squared', 'Price_drop_percent', 'Days_Temp', 'Days_Humidity',
      'Crop_Potato', 'Crop_Rice', 'Crop_Tomato', 'Crop_Wheat']
     """
-    
-    data = {
-        'Days_after_harvest': [req.days_after_harvest],
-        'Temperature': [req.temperature],
-        'Relative_Humidity': [req.humidity],
-        'Price_drop_percent': [req.price_drop_percent],
-        'Days_Temp': [req.days_after_harvest * req.temperature],
-        'Days_Humidity': [req.days_after_harvest * req.humidity],
-        'Temp_Humidity': [req.temperature * req.humidity],
-        'Days_Squared': [req.days_after_harvest ** 2],
-        
-        # Initialize one-hot encoded crops to 0
-        'Crop_Potato': [0],
-        'Crop_Rice': [0],
-        'Crop_Tomato': [0],
-        'Crop_Wheat': [0]
-    }
-    
-    # Set the specific crop to 1
-    crop_col = f"Crop_{req.crop.capitalize()}"
-    if crop_col in data:
-        data[crop_col] = [1]
-    
-    # Create DataFrame with exact column order
-    df = pd.DataFrame(data)
-    
-    # Ensure exact column order as specified by the model's actual signature
-    expected_cols = [
-        'Days_after_harvest', 'Temperature', 'Relative_Humidity', 'Price_drop_percent',
-        'Days_Temp', 'Days_Humidity', 'Temp_Humidity', 'Days_Squared', 
-        'Crop_Potato', 'Crop_Rice', 'Crop_Tomato', 'Crop_Wheat'
-    ]
-    
-    return df[expected_cols]
+    return construct_spoilage_features_batch(
+        [req.crop], [req.temperature], [req.humidity], [req.days_after_harvest], [req.price_drop_percent]
+    )
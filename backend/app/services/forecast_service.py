@@ -1,16 +1,33 @@
 import pandas as pd
 import numpy as np
 import logging
+import time
 from sqlalchemy.orm import Session
 from sqlalchemy import text
 from app.schemas.requests import ForecastRequest
 from app.schemas.responses import ForecastResponse
+from app.services.circuit_breaker import CircuitBreaker
+from app.config import settings
 
 logger = logging.getLogger(__name__)
 
-def fetch_historical_prices(db: Session, request: ForecastRequest) -> pd.DataFrame:
+# Recovery is tested with a real price query (half-open trial), since a database that
+# still answers trivial queries can be the one timing out on market_prices
+price_circuit = CircuitBreaker(
+    name="market_prices",
+    failure_threshold=settings.DB_CIRCUIT_FAILURE_THRESHOLD,
+    probe_interval=settings.DB_CIRCUIT_PROBE_INTERVAL_SECONDS,
+    slow_call_seconds=settings.DB_CIRCUIT_SLOW_CALL_SECONDS,
+)
+
+# Last-known-good price history per (state, commodity), served while the circuit is open
+_last_good_prices = {}
+
+def fetch_historical_prices(db: Session, request: ForecastRequest) -> tuple:
     """
     Fetches the last 30 days of historical prices from PostgreSQL.
+    Returns the prices and where they came from: "database", "cache" (last-known-good
+    series, used while the database is failing) or "generated".
     """
     # A basic implementation. In reality, you'd match the state/commodity.
     # Assuming 'market_prices' table has columns: id, state, commodity, price_date, modal_price
@@ -22,26 +39,45 @@ def fetch_historical_prices(db: Session, request: ForecastRequest) -> pd.DataFra
         LIMIT 30
     """)
     
-    try:
-        result = db.execute(query, {"state": request.state, "commodity": request.commodity}).fetchall()
-    except Exception as e:
-        logger.warning(f"Database connection failed: {e}. Using dummy historical data.")
-        result = None
+    cache_key = (request.state, request.commodity)
+    result = None
+    db_available = price_circuit.allow_request()
+    if db_available:
+        try:
+            started = time.perf_counter()
+            if settings.DB_STATEMENT_TIMEOUT_MS > 0:
+                # SET LOCAL ends with the transaction, so pooled connections are left untouched
+                db.execute(text(f"SET LOCAL statement_timeout = {int(settings.DB_STATEMENT_TIMEOUT_MS)}"))
+            result = db.execute(query, {"state": request.state, "commodity": request.commodity}).fetchall()
+            price_circuit.record_success(time.perf_counter() - started)
+        except Exception as e:
+            logger.warning(f"Database connection failed: {e}.")
+            price_circuit.record_failure()
+            db_available = False
+    else:
+        logger.info(f"Price database circuit is {price_circuit.state}, skipping query.")
     
-    # If no data is found, we might need a fallback or to raise an error
-    if not result:
+    if result:
+        df = pd.DataFrame(result, columns=['price_date', 'modal_price'])
+        data_source = "database"
+    elif not db_available and cache_key in _last_good_prices:
+        logger.info(f"Serving cached historical data for {request.commodity} in {request.state}.")
+        df = _last_good_prices[cache_key].copy()
+        data_source = "cache"
+    else:
         # Fallback for demonstration/testing if DB is empty 
         # In production, raise ValueError("Not enough historical data")
         logger.info(f"Using generated historical data for {request.commodity} in {request.state} due to missing DB/data.")
         dates = pd.date_range(end=pd.Timestamp.today(), periods=30)
         prices = np.linspace(1500, 2000, 30) + np.random.normal(0, 50, 30)
         df = pd.DataFrame({'price_date': dates, 'modal_price': prices})
-    else:
-        df = pd.DataFrame(result, columns=['price_date', 'modal_price'])
+        data_source = "generated"
     
     df['price_date'] = pd.to_datetime(df['price_date'])
     df = df.sort_values('price_date').reset_index(drop=True)
-    return df
+    if data_source == "database":
+        _last_good_prices[cache_key] = df.copy()
+    return df, data_source
 
 from scipy.stats import linregress
 
@@ -64,7 +100,7 @@ def get_forecast(req: ForecastRequest, db: Session) -> ForecastResponse:
         if not forecast_model or not loaded_feature_columns:
             raise ValueError("Forecast model or feature columns not loaded.")
         
-        last_n_days_dataframe = fetch_historical_prices(db, req)
+        last_n_days_dataframe, data_source = fetch_historical_prices(db, req)
         
         # Renaissance the data setup from notebook
         last_n_days_dataframe = last_n_days_dataframe.rename(columns={'price_date': 'Price Date', 'modal_price': 'Modal_Price'})
@@ -171,7 +207,9 @@ def get_forecast(req: ForecastRequest, db: Session) -> ForecastResponse:
         
         return ForecastResponse(
             forecast=[round(p, 2) for p in forecasts],
-            trend_percent=round(trend_percent, 2)
+            trend_percent=round(trend_percent, 2),
+            stale=data_source != "database",
+            data_source=data_source
         )
         
     except Exception as e:
@@ -0,0 +1,381 @@
+import hashlib
+import itertools
+import json
+import logging
+import os
+from datetime import datetime, timezone
+
+import numpy as np
+import pandas as pd
+
+from app.schemas.requests import CropRecommendationRequest, SpoilageRequest
+from app.utils import sha256_file
+from app.services.crop_recommendation_service import (
+    CROP_REC_INPUT_COLUMNS,
+    growth_cycle,
+    recommend_crop_ml_from_loaded_model,
+    sustainability_impact,
+    water_requirement,
+)
+from app.services.feature_engineering import (
+    SPOILAGE_FEATURE_COLUMNS,
+    construct_spoilage_features,
+    construct_spoilage_features_batch,
+)
+from app.services.spoilage_service import SPOILAGE_RISK_WEIGHTS, class_mapping, predict_spoilage
+from app.services.spoilage_surface import SURFACE_GRID
+
+logger = logging.getLogger(__name__)
+
+# Bump whenever the on-device file layout changes in a way older app builds cannot read
+BUNDLE_FORMAT_VERSION = 1
+
+MANIFEST_FILE = "manifest.json"
+CROP_LOOKUP_FILE = "crop_recommendation_lookup.json"
+SPOILAGE_TREES_FILE = "spoilage_trees.bin"
+
+# Marks a leaf in the flat `split_feature` array
+LEAF_FEATURE = 0xFF
+
+
+def _crop_rec_vocabulary(feature_columns) -> dict:
+    """
+    Recovers the known values of each categorical input from the one-hot column names,
+    e.g. 'Previous_Crop_Black Gram' -> Previous_Crop: 'Black Gram'.
+    """
+    vocabulary = {col: [] for col in CROP_REC_INPUT_COLUMNS}
+    for feature in feature_columns:
+        for col in CROP_REC_INPUT_COLUMNS:
+            if feature.startswith(f"{col}_"):
+                vocabulary[col].append(feature[len(col) + 1:])
+                break
+    return vocabulary
+
+
+def build_crop_lookup(model, feature_columns) -> dict:
+    """
+    Scores every (soil type, previous crop, state) combination in one batch.
+    Each input axis carries one extra trailing slot for values the model has never seen,
+    which the server encodes as an all-zero one-hot group.
+    """
+    vocabulary = _crop_rec_vocabulary(feature_columns)
+    axes = [vocabulary[col] + [None] for col in CROP_REC_INPUT_COLUMNS]
+    column_index = {name: i for i, name in enumerate(feature_columns)}
+
+    combos = list(itertools.product(*axes))
+    grid = np.zeros((len(combos), len(feature_columns)), dtype=np.int64)
+    for row, combo in enumerate(combos):
+        for col, value in zip(CROP_REC_INPUT_COLUMNS, combo):
+            if value is not None:
+                grid[row, column_index[f"{col}_{value}"]] = 1
+
+    predictions = model.predict(pd.DataFrame(grid, columns=feature_columns))
+    classes = [str(c) for c in model.classes_]
+    class_index = {c: i for i, c in enumerate(classes)}
+
+    return {
+        "inputs": CROP_REC_INPUT_COLUMNS,
+        "vocabulary": vocabulary,
+        "classes": classes,
+        # Row-major over `inputs`, unknown value last on every axis
+        "table": [class_index[str(p)] for p in predictions],
+        "water_requirement": {c: water_requirement.get(c, "N/A") for c in classes},
+        "growth_cycle": {c: growth_cycle.get(c, "N/A") for c in classes},
+        "sustainability_impact": {c: sustainability_impact.get(c, "N/A") for c in classes},
+    }
+
+
+def build_spoilage_tree_arrays(model) -> tuple:
+    """
+    Flattens the XGBoost booster into per-node arrays.
+    Thresholds stay float32 (XGBoost compares in float32), leaf values are quantized to
+    int16 with a single scale and child pointers are tree-local int16 offsets.
+    """
+    booster = model.get_booster()
+    dump = json.loads(booster.save_raw('json'))
+    learner = dump['learner']
+    gbtree = learner['gradient_booster']['model']
+    trees = gbtree['trees']
+    num_class = int(learner['learner_model_param']['num_class'])
+
+    # base_score is either a scalar or one value per class, added to the raw margin
+    base_score = np.atleast_1d(np.asarray(json.loads(learner['learner_model_param']['base_score']), dtype=np.float64))
+    base_margin = np.broadcast_to(base_score, (num_class,)).astype(np.float32)
+
+    leaf_values = [
+        cond
+        for tree in trees
+        for cond, left in zip(tree['split_conditions'], tree['left_children'])
+        if left == -1
+    ]
+    max_abs_leaf = max(abs(v) for v in leaf_values) or 1.0
+    leaf_scale = max_abs_leaf / np.iinfo(np.int16).max
+
+    split_feature, threshold, left_child, right_child, leaf_value = [], [], [], [], []
+    tree_offset, tree_class = [], []
+    for tree, cls in zip(trees, gbtree['tree_info']):
+        tree_offset.append(len(split_feature))
+        tree_class.append(cls)
+        for left, right, feature, cond in zip(tree['left_children'], tree['right_children'],
+                                              tree['split_indices'], tree['split_conditions']):
+            if left == -1:
+                split_feature.append(LEAF_FEATURE)
+                threshold.append(0.0)
+                left_child.append(-1)
+                right_child.append(-1)
+                leaf_value.append(int(round(cond / leaf_scale)))
+            else:
+                split_feature.append(feature)
+                threshold.append(cond)
+                left_child.append(left)
+                right_child.append(right)
+                leaf_value.append(0)
+
+    arrays = {
+        "tree_offset": np.asarray(tree_offset, dtype='<i4'),
+        "tree_class": np.asarray(tree_class, dtype='u1'),
+        "split_feature": np.asarray(split_feature, dtype='u1'),
+        "threshold": np.asarray(threshold, dtype='<f4'),
+        "left_child": np.asarray(left_child, dtype='<i2'),
+        "right_child": np.asarray(right_child, dtype='<i2'),
+        "leaf_value": np.asarray(leaf_value, dtype='<i2'),
+    }
+    meta = {
+        "num_class": num_class,
+        "num_trees": len(trees),
+        "num_nodes": len(split_feature),
+        "base_margin": [float(v) for v in base_margin],
+        "leaf_scale": float(leaf_scale),
+        "feature_columns": SPOILAGE_FEATURE_COLUMNS,
+        "class_labels": [class_mapping[i] for i in range(num_class)],
+        "risk_weights": SPOILAGE_RISK_WEIGHTS,
+    }
+    return arrays, meta
+
+
+def _write_arrays(path: str, arrays: dict) -> list:
+    """
+    Concatenates the arrays into one little-endian blob, 4-byte aligned,
+    and returns the layout table stored in the manifest.
+    """
+    layout = []
+    offset = 0
+    with open(path, 'wb') as f:
+        for name, arr in arrays.items():
+            padding = (-offset) % 4
+            f.write(b'\x00' * padding)
+            offset += padding
+            f.write(arr.tobytes())
+            layout.append({"name": name, "dtype": arr.dtype.str, "offset": offset, "count": int(arr.size)})
+            offset += arr.nbytes
+    return layout
+
+
+def export_mobile_bundle(output_dir: str) -> dict:
+    """
+    Writes the on-device bundle from the models currently loaded in `app.main.models`.
+    The bundle version is derived from the file checksums, so it only changes when the
+    exported content does and the app can skip syncing otherwise.
+    """
+    from app.main import models
+    crop_model = models.get('crop_rec_model')
+    crop_feature_columns = models.get('crop_rec_feature_columns')
+    spoilage_model = models.get('spoilage_model')
+    if crop_model is None or crop_feature_columns is None or spoilage_model is None:
+        raise ValueError("Crop recommendation and spoilage models must be loaded before export.")
+
+    os.makedirs(output_dir, exist_ok=True)
+
+    crop_path = os.path.join(output_dir, CROP_LOOKUP_FILE)
+    with open(crop_path, 'w', encoding='utf-8') as f:
+        json.dump(build_crop_lookup(crop_model, list(crop_feature_columns)), f, separators=(',', ':'))
+
+    arrays, spoilage_meta = build_spoilage_tree_arrays(spoilage_model)
+    trees_path = os.path.join(output_dir, SPOILAGE_TREES_FILE)
+    spoilage_meta["arrays"] = _write_arrays(trees_path, arrays)
+
+    files = {}
+    for name, path in ((CROP_LOOKUP_FILE, crop_path), (SPOILAGE_TREES_FILE, trees_path)):
+        files[name] = {"sha256": sha256_file(path), "bytes": os.path.getsize(path)}
+
+    version_digest = hashlib.sha256(str(BUNDLE_FORMAT_VERSION).encode())
+    for name in sorted(files):
+        version_digest.update(f"{name}:{files[name]['sha256']}".encode())
+
+    manifest = {
+        "format_version": BUNDLE_FORMAT_VERSION,
+        "bundle_version": version_digest.hexdigest()[:16],
+        "generated_at": datetime.now(timezone.utc).isoformat(),
+        "files": files,
+        "crop_recommendation": {"file": CROP_LOOKUP_FILE},
+        "spoilage": {"file": SPOILAGE_TREES_FILE, **spoilage_meta},
+    }
+    with open(os.path.join(output_dir, MANIFEST_FILE), 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, indent=2)
+
+    logger.info(f"Exported mobile bundle {manifest['bundle_version']} to {output_dir}")
+    return manifest
+
+
+class MobileBundleEvaluator:
+    """
+    Reference implementation of on-device scoring.
+    Only reads the exported files, so it doubles as the spec for the Flutter port.
+    """
+
+    def __init__(self, bundle_dir: str):
+        with open(os.path.join(bundle_dir, MANIFEST_FILE), encoding='utf-8') as f:
+            self.manifest = json.load(f)
+        if self.manifest["format_version"] != BUNDLE_FORMAT_VERSION:
+            raise ValueError(f"Unsupported bundle format version {self.manifest['format_version']}.")
+
+        for name, info in self.manifest["files"].items():
+            if sha256_file(os.path.join(bundle_dir, name)) != info["sha256"]:
+                raise ValueError(f"Checksum mismatch for {name}.")
+
+        with open(os.path.join(bundle_dir, CROP_LOOKUP_FILE), encoding='utf-8') as f:
+            self.crop_lookup = json.load(f)
+
+        spoilage = self.manifest["spoilage"]
+        with open(os.path.join(bundle_dir, SPOILAGE_TREES_FILE), 'rb') as f:
+            blob = f.read()
+        self.arrays = {
+            a["name"]: np.frombuffer(blob, dtype=np.dtype(a["dtype"]), count=a["count"], offset=a["offset"])
+            for a in spoilage["arrays"]
+        }
+        self.spoilage = spoilage
+
+    def recommend_crop(self, soil_type: str, previous_crop: str, state: str) -> dict:
+        lookup = self.crop_lookup
+        index = 0
+        for col, value in zip(lookup["inputs"], (soil_type, previous_crop, state)):
+            known = lookup["vocabulary"][col]
+            position = known.index(value) if value in known else len(known)
+            index = index * (len(known) + 1) + position
+        crop = lookup["classes"][lookup["table"][index]]
+        return {
+            "recommended_crop": crop,
+            "water_requirement": lookup["water_requirement"][crop],
+            "growth_cycle": lookup["growth_cycle"][crop],
+            "sustainability_impact": lookup["sustainability_impact"][crop],
+        }
+
+    def spoilage_probabilities(self, features: np.ndarray) -> np.ndarray:
+        """
+        Scores a (n_rows, n_features) matrix, walking all rows through each tree at once.
+        """
+        a = self.arrays
+        X = np.asarray(features, dtype=np.float32)
+        rows = np.arange(len(X))
+        margin = np.tile(np.asarray(self.spoilage["base_margin"], dtype=np.float32), (len(X), 1))
+        leaf_scale = np.float32(self.spoilage["leaf_scale"])
+
+        for offset, cls in zip(a["tree_offset"], a["tree_class"]):
+            node = np.full(len(X), offset, dtype=np.int64)
+            active = a["split_feature"][node] != LEAF_FEATURE
+            while active.any():
+                current = node[active]
+                feature = a["split_feature"][current]
+                go_left = X[rows[active], feature] < a["threshold"][current]
+                child = np.where(go_left, a["left_child"][current], a["right_child"][current])
+                node[active] = offset + child
+                active = a["split_feature"][node] != LEAF_FEATURE
+            margin[:, cls] += a["leaf_value"][node].astype(np.float32) * leaf_scale
+
+        margin = margin.astype(np.float64)
+        exp = np.exp(margin - margin.max(axis=1, keepdims=True))
+        return exp / exp.sum(axis=1, keepdims=True)
+
+    def predict_spoilage(self, features: np.ndarray) -> list:
+        probabilities = self.spoilage_probabilities(features)
+        labels = self.spoilage["class_labels"]
+        risk = np.minimum(1.0, probabilities @ np.asarray(self.spoilage["risk_weights"]))
+        predicted = probabilities.argmax(axis=1)
+        return [
+            {
+                "class_label": labels[idx],
+                "probability": round(float(r), 4),
+                "confidence": round(float(p[idx]), 4),
+            }
+            for idx, r, p in zip(predicted, risk, probabilities)
+        ]
+
+
+def verify_mobile_bundle(bundle_dir: str, n_samples: int = 2000, tolerance: float = 1e-3, seed: int = 42) -> dict:
+    """
+    Replays requests through the server services and the exported bundle and compares them.
+    Crop recommendation is checked exhaustively (every known value plus an unknown one);
+    spoilage on random requests spanning the training ranges of `dataset/spoilage.csv`.
+    A spoilage class mismatch only counts when the server's top two classes are further
+    apart than `tolerance`, since leaf quantization can legitimately flip near-ties.
+    """
+    evaluator = MobileBundleEvaluator(bundle_dir)
+
+    # -------- CROP RECOMMENDATION --------
+    vocabulary = evaluator.crop_lookup["vocabulary"]
+    axes = [vocabulary[col] + ["Unknown"] for col in CROP_REC_INPUT_COLUMNS]
+    crop_mismatches = 0
+    crop_checked = 0
+    for soil_type, previous_crop, state in itertools.product(*axes):
+        server = recommend_crop_ml_from_loaded_model(
+            CropRecommendationRequest(soil_type=soil_type, previous_crop=previous_crop, state=state)
+        ).model_dump()
+        if server != evaluator.recommend_crop(soil_type, previous_crop, state):
+            crop_mismatches += 1
+        crop_checked += 1
+
+    # -------- SPOILAGE --------
+    from app.main import models
+    spoilage_model = models.get('spoilage_model')
+    rng = np.random.default_rng(seed)
+    crops = [c[len("Crop_"):] for c in SPOILAGE_FEATURE_COLUMNS if c.startswith("Crop_")] + ["Onion"]
+    # SURFACE_GRID spans the numeric ranges of dataset/spoilage.csv
+    ranges = {name: (start, stop) for name, start, stop, _ in SURFACE_GRID}
+    requests = [
+        SpoilageRequest(
+            crop=str(rng.choice(crops)),
+            temperature=float(rng.uniform(*ranges['temperature'])),
+            humidity=float(rng.uniform(*ranges['humidity'])),
+            days_after_harvest=int(rng.integers(int(ranges['days_after_harvest'][0]), int(ranges['days_after_harvest'][1]) + 1)),
+            price_drop_percent=float(rng.uniform(*ranges['price_drop_percent'])),
+        )
+        for _ in range(n_samples)
+    ]
+    features = construct_spoilage_features_batch(
+        [r.crop for r in requests],
+        [r.temperature for r in requests],
+        [r.humidity for r in requests],
+        [r.days_after_harvest for r in requests],
+        [r.price_drop_percent for r in requests],
+    )
+    bundle_results = evaluator.predict_spoilage(features.to_numpy(dtype=np.float32))
+
+    max_prob_error = 0.0
+    max_conf_error = 0.0
+    class_mismatches = 0
+    for req, bundle in zip(requests, bundle_results):
+        server = predict_spoilage(req)
+        max_prob_error = max(max_prob_error, abs(server.probability - bundle["probability"]))
+        if server.class_label != bundle["class_label"]:
+            top_two = np.sort(spoilage_model.predict_proba(construct_spoilage_features(req))[0])[-2:]
+            if top_two[1] - top_two[0] > tolerance:
+                class_mismatches += 1
+        else:
+            max_conf_error = max(max_conf_error, abs(server.confidence - bundle["confidence"]))
+
+    report = {
+        "bundle_version": evaluator.manifest["bundle_version"],
+        "crop_recommendation_checked": crop_checked,
+        "crop_recommendation_mismatches": crop_mismatches,
+        "spoilage_checked": n_samples,
+        "spoilage_class_mismatches": class_mismatches,
+        "spoilage_max_probability_error": round(max_prob_error, 6),
+        "spoilage_max_confidence_error": round(max_conf_error, 6),
+    }
+    report["passed"] = (
+        crop_mismatches == 0
+        and class_mismatches == 0
+        and max_prob_error <= tolerance
+        and max_conf_error <= tolerance
+    )
+    return report
@@ -0,0 +1,175 @@
+import io
+import logging
+import zipfile
+
+import numpy as np
+
+from app.config import settings
+from app.services.feature_engineering import construct_spoilage_features_batch
+from app.services.spoilage_service import class_mapping, spoilage_risk
+
+logger = logging.getLogger(__name__)
+
+# Payloads in both directions are NumPy .npz archives (named, typed, columnar arrays)
+RISK_MAP_MEDIA_TYPE = "application/x-npz"
+
+# Accepted request arrays and their dtype kinds; price_drop_percent is optional
+PAYLOAD_ARRAYS = {
+    "temperature": "fiu",
+    "humidity": "fiu",
+    "crops": "U",
+    "days_after_harvest": "iu",
+    "price_drop_percent": "fiu",
+}
+OPTIONAL_ARRAYS = {"price_drop_percent"}
+
+# Crop names are repeated once per scored row, so their width is bounded separately
+MAX_CROP_NAME_LENGTH = 64
+
+def _read_array_header(archive: zipfile.ZipFile, member: str) -> tuple:
+    """
+    Shape and dtype of one .npy member, read from its header without decompressing the data.
+    """
+    with archive.open(member) as f:
+        version = np.lib.format.read_magic(f)
+        if version == (1, 0):
+            shape, _, dtype = np.lib.format.read_array_header_1_0(f)
+        elif version == (2, 0):
+            shape, _, dtype = np.lib.format.read_array_header_2_0(f)
+        else:
+            raise ValueError(f"unsupported .npy format version {version}")
+    return shape, dtype
+
+def _load_payload(payload: bytes) -> dict:
+    """
+    Checks every expected array's header (dtype, element count, total risk map size)
+    against SPOILAGE_RISK_MAP_MAX_CELLS before any array data is decompressed,
+    then loads only those arrays. Other archive members are ignored.
+    """
+    max_cells = settings.SPOILAGE_RISK_MAP_MAX_CELLS
+    try:
+        archive = zipfile.ZipFile(io.BytesIO(payload))
+    except Exception as e:
+        raise ValueError(f"Payload is not a valid .npz archive: {e}")
+
+    with archive:
+        members = set(archive.namelist())
+        sizes = {}
+        for name, kinds in PAYLOAD_ARRAYS.items():
+            member = f"{name}.npy"
+            if member not in members:
+                if name in OPTIONAL_ARRAYS:
+                    continue
+                raise ValueError(f"Missing array '{name}'.")
+            try:
+                shape, dtype = _read_array_header(archive, member)
+            except Exception as e:
+                raise ValueError(f"Array '{name}' has an invalid header: {e}")
+            if dtype.kind not in kinds:
+                raise ValueError(f"Array '{name}' has unsupported dtype {dtype}.")
+            if name == "crops" and dtype.itemsize > MAX_CROP_NAME_LENGTH * np.dtype('U1').itemsize:
+                raise ValueError(f"Crop names longer than {MAX_CROP_NAME_LENGTH} characters are not supported.")
+            size = int(np.prod(shape, dtype=np.int64))
+            # Bound decoded bytes too, so a wide unicode dtype cannot stand in for many elements
+            if size > max_cells or size * dtype.itemsize > max_cells * 8:
+                raise ValueError(f"Array '{name}' of shape {shape} and dtype {dtype} exceeds the risk map size limit.")
+            sizes[name] = size
+
+        n_cells_total = sizes["temperature"] * sizes["crops"] * sizes["days_after_harvest"]
+        if n_cells_total > max_cells:
+            raise ValueError(f"Risk map of {n_cells_total} cells exceeds the limit of {max_cells}.")
+
+        arrays = {}
+        for name in sizes:
+            try:
+                with archive.open(f"{name}.npy") as f:
+                    arrays[name] = np.lib.format.read_array(f, allow_pickle=False)
+            except Exception as e:
+                raise ValueError(f"Array '{name}' could not be read: {e}")
+    return arrays
+
+def compute_risk_map(temperature, humidity, crops, days_after_harvest, price_drop_percent=0.0, chunk_rows: int = 65536) -> tuple:
+    """
+    Scores every (weather cell, crop, day offset) combination.
+    temperature/humidity/price_drop_percent share one weather grid shape S (price drop may be a scalar),
+    crops and days_after_harvest are 1-D. Returns risk (float32) and predicted class (uint8),
+    both shaped (*S, n_crops, n_days).
+    Features are built with construct_spoilage_features_batch, one chunk of rows at a time.
+    """
+    from app.main import models
+    spoilage_model = models.get('spoilage_model')
+    if not spoilage_model:
+        raise ValueError("Spoilage model not loaded.")
+
+    temperature = np.asarray(temperature, dtype=np.float64)
+    humidity = np.asarray(humidity, dtype=np.float64)
+    if temperature.shape != humidity.shape:
+        raise ValueError(f"temperature {temperature.shape} and humidity {humidity.shape} must have the same shape.")
+    price_drop = np.broadcast_to(np.asarray(price_drop_percent, dtype=np.float64), temperature.shape)
+    crops = np.asarray(crops)
+    days = np.asarray(days_after_harvest)
+    if crops.ndim != 1 or days.ndim != 1 or crops.size == 0 or days.size == 0:
+        raise ValueError("crops and days_after_harvest must be non-empty 1-D arrays.")
+
+    n_cells = temperature.size
+    n_cells_total = n_cells * crops.size * days.size
+    if n_cells_total > settings.SPOILAGE_RISK_MAP_MAX_CELLS:
+        raise ValueError(f"Risk map of {n_cells_total} cells exceeds the limit of {settings.SPOILAGE_RISK_MAP_MAX_CELLS}.")
+
+    temp_flat = temperature.reshape(-1)
+    rh_flat = humidity.reshape(-1)
+    drop_flat = price_drop.reshape(-1)
+
+    # Crop-major while scoring so each crop's rows are contiguous
+    risk = np.empty((crops.size, n_cells * days.size), dtype=np.float32)
+    predicted = np.empty((crops.size, n_cells * days.size), dtype=np.uint8)
+
+    for c, crop in enumerate(crops):
+        for start in range(0, n_cells * days.size, chunk_rows):
+            stop = min(start + chunk_rows, n_cells * days.size)
+            # Row r covers weather cell r // n_days at day offset r % n_days
+            cell, day = np.divmod(np.arange(start, stop), days.size)
+            features = construct_spoilage_features_batch(
+                np.full(stop - start, crop), temp_flat[cell], rh_flat[cell], days[day], drop_flat[cell]
+            )
+            probabilities = spoilage_model.predict_proba(features)
+            risk[c, start:stop] = spoilage_risk(probabilities)
+            predicted[c, start:stop] = probabilities.argmax(axis=1)
+
+    out_shape = (*temperature.shape, crops.size, days.size)
+    risk = np.moveaxis(risk.reshape(crops.size, n_cells, days.size), 0, 1)
+    predicted = np.moveaxis(predicted.reshape(crops.size, n_cells, days.size), 0, 1)
+    return np.ascontiguousarray(risk).reshape(out_shape), np.ascontiguousarray(predicted).reshape(out_shape)
+
+def predict_spoilage_risk_map(payload: bytes) -> bytes:
+    """
+    Request archive:
+        temperature, humidity     float arrays, same weather grid shape (e.g. districts x forecast steps)
+        crops                     1-D unicode array, e.g. np.array(["Potato", "Rice"])
+        days_after_harvest        1-D integer array of storage day offsets
+        price_drop_percent        optional float, scalar or weather grid shape (default 0)
+    Response archive:
+        risk                      float32 (*grid, n_crops, n_days)
+        class_index               uint8, same shape, indexes class_labels
+        class_labels, crops, days_after_harvest
+    """
+    arrays = _load_payload(payload)
+    temperature = arrays["temperature"]
+    humidity = arrays["humidity"]
+    crops = arrays["crops"]
+    days = arrays["days_after_harvest"]
+    price_drop = arrays.get("price_drop_percent", 0.0)
+
+    risk, predicted = compute_risk_map(temperature, humidity, crops, days, price_drop)
+    logger.info(f"Scored spoilage risk map of shape {risk.shape}")
+
+    buffer = io.BytesIO()
+    np.savez(
+        buffer,
+        risk=risk,
+        class_index=predicted,
+        class_labels=np.array([class_mapping[i] for i in sorted(class_mapping)]),
+        crops=crops,
+        days_after_harvest=days,
+    )
+    return buffer.getvalue()
@@ -7,6 +7,24 @@ from app.main import models
 
 logger = logging.getLogger(__name__)
 
+# Decision Logic Mapping for the XGBClassifier output classes (0, 1, or 2)
+class_mapping = {
+    0: "No spoilage",
+    1: "Moderate spoilage",
+    2: "Severe spoilage"
+}
+
+# Severity weight per class: risk = prob(Moderate) * 0.5 + prob(Severe) * 1.0
+SPOILAGE_RISK_WEIGHTS = [0.0, 0.5, 1.0]
+
+def spoilage_risk(probabilities: np.ndarray) -> np.ndarray:
+    """
+    Overall spoilage probability (for the pie chart/gauge) from class probabilities.
+    Works on a single row or on a (n_samples, n_classes) batch.
+    """
+    # Clamp to 1.0 just in case
+    return np.minimum(1.0, probabilities @ np.asarray(SPOILAGE_RISK_WEIGHTS))
+
 def predict_spoilage(req: SpoilageRequest) -> SpoilageResponse:
     try:
         from app.main import models
@@ -14,22 +32,26 @@ def predict_spoilage(req: SpoilageRequest) -> SpoilageResponse:
         if not spoilage_model:
             raise ValueError("Spoilage model not loaded.")
         
-        # 1. Construct Features
-        features_df = construct_spoilage_features(req)
+        # 1. Use the precomputed response surface when enabled and the request is inside its grid
+        probabilities = None
+        spoilage_surface = models.get('spoilage_surface')
+        if spoilage_surface is not None:
+            probabilities = spoilage_surface.lookup(
+                req.crop, req.temperature, req.humidity, req.days_after_harvest, req.price_drop_percent
+            )
         
-        # 2. Predict Probabilities using the loaded XGBClassifier
-        # predict_proba returns array shape (n_samples, n_classes)
-        probabilities = spoilage_model.predict_proba(features_df)[0]
+        if probabilities is None:
+            # 2. Construct Features
+            features_df = construct_spoilage_features(req)
+            
+            # 3. Predict Probabilities using the loaded XGBClassifier
+            # predict_proba returns array shape (n_samples, n_classes)
+            probabilities = spoilage_model.predict_proba(features_df)[0]
         
         # Determine the predicted class (0, 1, or 2)
         predicted_class_idx = int(np.argmax(probabilities))
         
-        # 3. Decision Logic Mapping
-        class_mapping = {
-            0: "No spoilage",
-            1: "Moderate spoilage",
-            2: "Severe spoilage"
-        }
+        # 4. Decision Logic Mapping
         class_label = class_mapping.get(predicted_class_idx, "Unknown")
         
         # Probability of the predicted class
@@ -37,11 +59,7 @@ def predict_spoilage(req: SpoilageRequest) -> SpoilageResponse:
         
         # For the overall spoilage probability (for the pie chart/gauge),
         # we can sum moderate + severe probabilities, or just use the severity weight.
-        # Let's say risk = prob(Moderate) * 0.5 + prob(Severe) * 1.0
-        # If classes are 0, 1, 2:
-        risk_probability = float(probabilities[1]) * 0.5 + float(probabilities[2]) * 1.0
-        # Clamp to 1.0 just in case
-        risk_probability = min(1.0, risk_probability)
+        risk_probability = float(spoilage_risk(probabilities))
         
         confidence = prob_predicted
         
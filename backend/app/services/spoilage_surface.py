@@ -0,0 +1,180 @@
+import itertools
+import logging
+import time
+
+import numpy as np
+
+from app.services.feature_engineering import SPOILAGE_FEATURE_COLUMNS, construct_spoilage_features_batch
+from app.services.spoilage_service import spoilage_risk
+
+logger = logging.getLogger(__name__)
+
+# (start, stop, points) per numeric input, covering the ranges of dataset/spoilage.csv.
+# The model is a sum of step functions, so many cells straddle a step and are left to the
+# model; doubling every axis only raises the trusted share from about 39% to 51% at 11x the build time.
+SURFACE_GRID = [
+    ('temperature', 20.0, 45.0, 11),
+    ('humidity', 40.0, 100.0, 13),
+    ('days_after_harvest', 0.0, 365.0, 38),
+    ('price_drop_percent', -30.0, 40.0, 15),
+]
+
+# One surface per one-hot crop column plus one for every other crop (all-zero encoding)
+SURFACE_CROP_COLUMNS = [c for c in SPOILAGE_FEATURE_COLUMNS if c.startswith('Crop_')]
+OTHER_CROP = 'Other'
+
+
+def _reduce_cell_corners(arr: np.ndarray, fn) -> np.ndarray:
+    """
+    Combines the 16 corners of every grid cell with `fn` (np.maximum / np.minimum),
+    shrinking each of the four grid axes of (n_crops, *grid, ...) by one.
+    """
+    for axis in range(1, 1 + len(SURFACE_GRID)):
+        n = arr.shape[axis]
+        arr = fn(arr.take(np.arange(n - 1), axis=axis), arr.take(np.arange(1, n), axis=axis))
+    return arr
+
+
+class SpoilageResponseSurface:
+    """
+    Precomputed class probabilities of the spoilage model on a dense grid per crop,
+    served by multilinear interpolation.
+    Only cells whose corners agree on the predicted class and whose corner probabilities
+    stay within `tolerance` of each other are served; requests outside the grid or in any
+    other cell return None so the caller falls back to the model.
+    """
+
+    def __init__(self, values: np.ndarray, report: dict, tolerance: float):
+        # values: (n_crops, *grid points, n_classes) float32
+        self.values = values
+        self.report = report
+        self.tolerance = tolerance
+        classes = values.argmax(axis=-1)
+        spread = (_reduce_cell_corners(values, np.maximum) - _reduce_cell_corners(values, np.minimum)).max(axis=-1)
+        # trusted: (n_crops, *grid cells) bool
+        self.trusted = (
+            (_reduce_cell_corners(classes, np.maximum) == _reduce_cell_corners(classes, np.minimum))
+            & (spread <= tolerance)
+        )
+        self.axes = [(start, (stop - start) / (points - 1), points) for _, start, stop, points in SURFACE_GRID]
+        self.crop_slots = {col: i for i, col in enumerate(SURFACE_CROP_COLUMNS)}
+        self.other_slot = len(SURFACE_CROP_COLUMNS)
+
+    @classmethod
+    def build(cls, model, tolerance: float = 0.02, validation_samples: int = 5000, seed: int = 42) -> "SpoilageResponseSurface":
+        start_time = time.perf_counter()
+        mesh = np.meshgrid(*[np.linspace(start, stop, points) for _, start, stop, points in SURFACE_GRID], indexing='ij')
+        grid_shape = mesh[0].shape
+        columns = [m.ravel() for m in mesh]
+
+        crop_names = [c[len('Crop_'):] for c in SURFACE_CROP_COLUMNS] + [OTHER_CROP]
+        values = np.empty((len(crop_names), *grid_shape, len(model.classes_)), dtype=np.float32)
+        for slot, crop in enumerate(crop_names):
+            features = construct_spoilage_features_batch(np.full(len(columns[0]), crop), *columns)
+            values[slot] = model.predict_proba(features).reshape(*grid_shape, -1)
+        build_seconds = time.perf_counter() - start_time
+
+        surface = cls(values, {}, tolerance)
+        surface.report = {
+            "grid_shape": [len(crop_names), *grid_shape],
+            "grid_points": int(values.size // values.shape[-1]),
+            "size_bytes": int(values.nbytes + surface.trusted.nbytes),
+            "tolerance": tolerance,
+            "trusted_cells": round(float(surface.trusted.mean()), 4),
+            "build_seconds": round(build_seconds, 2),
+            **surface.measure_error(model, crop_names, validation_samples, seed),
+        }
+        return surface
+
+    def measure_error(self, model, crop_names, n_samples: int, seed: int) -> dict:
+        """
+        Compares interpolated and live predictions on random in-grid requests for every crop.
+        Errors are measured on the requests the surface would actually serve;
+        coverage is the share of requests it serves.
+        """
+        rng = np.random.default_rng(seed)
+        risk_errors = []
+        max_probability_error = 0.0
+        agreements = 0
+        for slot, crop in enumerate(crop_names):
+            X = np.column_stack([
+                rng.uniform(start, stop, n_samples) if name != 'days_after_harvest'
+                else rng.integers(int(start), int(stop) + 1, n_samples).astype(float)
+                for name, start, stop, _ in SURFACE_GRID
+            ])
+            slots = np.full(n_samples, slot)
+            lower, _ = self._cells(X)
+            served = self.trusted[(slots, *lower)]
+            if not served.any():
+                continue
+            X, slots = X[served], slots[served]
+            live = model.predict_proba(construct_spoilage_features_batch(np.full(len(X), crop), *X.T))
+            approx = self.interpolate(slots, X)
+
+            risk_errors.append(np.abs(spoilage_risk(live) - spoilage_risk(approx)))
+            max_probability_error = max(max_probability_error, float(np.abs(live - approx).max()))
+            agreements += int((approx.argmax(axis=1) == live.argmax(axis=1)).sum())
+
+        total = n_samples * len(crop_names)
+        risk_errors = np.concatenate(risk_errors) if risk_errors else np.zeros(0)
+        served_count = len(risk_errors)
+        return {
+            "validation_samples": total,
+            "coverage": round(served_count / total, 4),
+            "max_risk_error": round(float(risk_errors.max()), 4) if served_count else None,
+            "p99_risk_error": round(float(np.percentile(risk_errors, 99)), 4) if served_count else None,
+            "mean_risk_error": round(float(risk_errors.mean()), 4) if served_count else None,
+            "max_probability_error": round(max_probability_error, 4) if served_count else None,
+            "class_agreement": round(agreements / served_count, 4) if served_count else None,
+        }
+
+    def _cells(self, X: np.ndarray) -> tuple:
+        """
+        Lower grid index and fractional position per axis for rows of
+        (temperature, humidity, days, price drop) lying inside the grid.
+        """
+        lower, fractions = [], []
+        for k, (start, step, points) in enumerate(self.axes):
+            pos = (X[:, k] - start) / step
+            i = np.clip(np.floor(pos).astype(np.int64), 0, points - 2)
+            lower.append(i)
+            fractions.append(pos - i)
+        return lower, fractions
+
+    def interpolate(self, slots: np.ndarray, X: np.ndarray) -> np.ndarray:
+        """
+        Vectorized multilinear interpolation for rows of (temperature, humidity, days, price drop).
+        Rows are assumed to lie inside the grid; the trusted-cell mask is not applied.
+        """
+        lower, fractions = self._cells(X)
+        out = np.zeros((len(X), self.values.shape[-1]))
+        for corner in itertools.product((0, 1), repeat=len(self.axes)):
+            weight = np.ones(len(X))
+            for bit, f in zip(corner, fractions):
+                weight *= f if bit else 1.0 - f
+            out += weight[:, None] * self.values[(slots, *[i + bit for i, bit in zip(lower, corner)])]
+        return out
+
+    def lookup(self, crop: str, temperature: float, humidity: float, days_after_harvest: float, price_drop_percent: float):
+        """
+        Class probabilities for a single request, or None if it falls outside the grid
+        or in a cell that is not trusted.
+        """
+        slot = self.crop_slots.get(f"Crop_{crop.capitalize()}", self.other_slot)
+        lower, fractions = [], []
+        point = (temperature, humidity, days_after_harvest, price_drop_percent)
+        for value, (start, step, points) in zip(point, self.axes):
+            pos = (value - start) / step
+            if not 0.0 <= pos <= points - 1:
+                return None
+            i = min(int(pos), points - 2)
+            lower.append(i)
+            fractions.append(pos - i)
+        if not self.trusted[(slot, *lower)]:
+            return None
+
+        # Keep the 16 corners of the cell, then collapse one axis at a time: 16 -> 8 -> 4 -> 2 -> 1
+        block = self.values[(slot, *[slice(i, i + 2) for i in lower])]
+        for f in fractions:
+            block = block[0] + (block[1] - block[0]) * f
+        return block.astype(np.float64)
@@ -0,0 +1,11 @@
+import hashlib
+
+def sha256_file(path: str) -> str:
+    """
+    Hex SHA-256 of a file, read in 1 MB blocks so large files never sit in memory.
+    """
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            digest.update(block)
+    return digest.hexdigest()
@@ -0,0 +1,36 @@
+"""
+Exports the on-device model bundle for the Flutter app (Application/).
+
+Usage (from backend/):
+    python export_mobile_bundle.py --output ../models/mobile_bundle --verify
+"""
+import argparse
+import json
+import sys
+
+from app.main import load_models
+from app.services.mobile_bundle import export_mobile_bundle, verify_mobile_bundle
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Export the crop recommendation and spoilage models for on-device scoring.")
+    parser.add_argument("--output", default="../models/mobile_bundle", help="Directory to write the bundle into")
+    parser.add_argument("--verify", action="store_true", help="Check the bundle against the server predictions after export")
+    parser.add_argument("--samples", type=int, default=2000, help="Number of random spoilage requests to verify")
+    args = parser.parse_args()
+
+    load_models()
+    manifest = export_mobile_bundle(args.output)
+    print(f"Bundle {manifest['bundle_version']} written to {args.output}")
+    for name, info in manifest["files"].items():
+        print(f"  {name}: {info['bytes']} bytes, sha256 {info['sha256']}")
+
+    if args.verify:
+        report = verify_mobile_bundle(args.output, n_samples=args.samples)
+        print(json.dumps(report, indent=2))
+        return 0 if report["passed"] else 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
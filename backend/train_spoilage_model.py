@@ -0,0 +1,47 @@
+"""
+Trains a new spoilage model from dataset/spoilage.csv with the serving feature pipeline.
+
+Usage (from backend/):
+    python train_spoilage_model.py --dataset ../dataset/spoilage.csv --output-dir ../models --n-iter 20
+
+The artifact is written as spoilage_model-<version>.pkl next to a JSON report with
+cross-validation scores and training/inference benchmarks. It does not replace the
+served model; point SPOILAGE_MODEL_PATH at it once the report looks good.
+"""
+import argparse
+import json
+import logging
+import sys
+
+from app.config import settings
+from app.services.spoilage_training import train_spoilage_model
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Train and benchmark a versioned spoilage model.")
+    parser.add_argument("--dataset", default="../dataset/spoilage.csv", help="Training CSV")
+    parser.add_argument("--output-dir", default="../models", help="Directory for the model artifact and report")
+    parser.add_argument("--n-iter", type=int, default=20, help="Hyperparameter candidates to sample")
+    parser.add_argument("--cv-folds", type=int, default=5, help="Stratified cross-validation folds")
+    parser.add_argument("--n-jobs", type=int, default=-1, help="Parallel workers (-1 uses all CPU cores)")
+    parser.add_argument("--chunksize", type=int, default=10000, help="Rows read from the CSV per chunk")
+    parser.add_argument("--seed", type=int, default=42, help="Random seed for splits and search")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    report = train_spoilage_model(
+        dataset_path=args.dataset,
+        output_dir=args.output_dir,
+        n_iter=args.n_iter,
+        cv_folds=args.cv_folds,
+        n_jobs=args.n_jobs,
+        random_state=args.seed,
+        chunksize=args.chunksize,
+        baseline_model_path=settings.SPOILAGE_MODEL_PATH,
+    )
+    print(json.dumps(report, indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())